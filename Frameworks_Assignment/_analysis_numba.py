@@ -0,0 +1,89 @@
+"""
+Optional Numba-accelerated kernels for the analysis helpers.
+
+Importing this module requires `numba`; callers guard the import and fall
+back to the vectorized pandas implementations when it is unavailable.
+"""
+
+import numpy as np
+from numba import get_num_threads, njit, prange, types
+from numba.typed import Dict
+
+# ASCII lowercase letter range
+_A, _Z = 97, 122
+
+
+@njit(cache=True)
+def _token_counts(buf):
+    """Count [a-z]{2,} runs in a uint8 buffer of lowercased ASCII text.
+
+    Returns three dicts keyed by an FNV-1a hash of the token: occurrence
+    counts, plus the start and length of each token's first occurrence so
+    the caller can decode the token text without a Python-level tokenizer.
+    """
+    counts = Dict.empty(types.int64, types.int64)
+    first_start = Dict.empty(types.int64, types.int64)
+    first_len = Dict.empty(types.int64, types.int64)
+    n = buf.size
+    i = 0
+    while i < n:
+        while i < n and not (_A <= buf[i] <= _Z):
+            i += 1
+        start = i
+        h = np.int64(-3750763034362895579)  # FNV-1a 64-bit offset basis
+        while i < n and _A <= buf[i] <= _Z:
+            h = (h ^ np.int64(buf[i])) * np.int64(1099511628211)
+            i += 1
+        length = i - start
+        if length >= 2:
+            if h in counts:
+                counts[h] += 1
+            else:
+                counts[h] = 1
+                first_start[h] = np.int64(start)
+                first_len[h] = np.int64(length)
+    return counts, first_start, first_len
+
+
+@njit(parallel=True, cache=True)
+def year_sum(years, values, lo, nbins):
+    """Sum `values` into per-year bins for years offset by `lo`.
+
+    Parallel equivalent of np.bincount(years - lo, weights=values):
+    each thread accumulates its slice into a private row of partials
+    (a plain prange over rows would race on +=), then the rows are
+    reduced. NaN values are skipped.
+    """
+    nthreads = get_num_threads()
+    partials = np.zeros((nthreads, nbins), dtype=np.float64)
+    chunk = (years.size + nthreads - 1) // nthreads
+    for t in prange(nthreads):
+        start = t * chunk
+        end = min(start + chunk, years.size)
+        for i in range(start, end):
+            v = values[i]
+            if not np.isnan(v):
+                partials[t, years[i] - lo] += v
+    out = np.zeros(nbins, dtype=np.float64)
+    for t in range(nthreads):
+        for j in range(nbins):
+            out[j] += partials[t, j]
+    return out
+
+
+def title_token_counts(titles):
+    """Count [a-z]{2,} tokens across an iterable of title strings.
+
+    Titles are lowercased; non-ASCII characters become '?' separators so
+    letter runs split exactly where the regex path splits them (e.g.
+    'naïve' tokenizes as 'na'/'ve' on both paths). Returns a plain dict
+    of token -> count.
+    """
+    joined = '\n'.join(titles).lower()
+    buf = np.frombuffer(joined.encode('ascii', 'replace'), dtype=np.uint8)
+    counts, first_start, first_len = _token_counts(buf)
+    out = {}
+    for h, c in counts.items():
+        start, length = first_start[h], first_len[h]
+        out[bytes(buf[start:start + length]).decode('ascii')] = c
+    return out
@@ -1,10 +1,13 @@
-def _load(path, fileobj, nrows):
+import hashlib
+import os
+
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 
 from data_analysis import (
     load_data,
+    load_data_chunked,
     clean_data,
     publications_by_year,
     top_journals,
@@ -39,50 +42,90 @@ if dataset == 'CORD-19 metadata':
     use_path = st.text_input('Or enter local path to metadata.csv', value='metadata_sample.csv')
     nrows = st.number_input('Read only N rows (0 = all)', min_value=0, step=1000, value=0)
 
-    @st.cache_data
-    def _load_metadata(path, fileobj, nrows):
-        if fileobj is not None:
-            df = pd.read_csv(fileobj, nrows=nrows if nrows and nrows>0 else None)
-        else:
-            df = load_data(path, nrows=nrows if nrows and nrows>0 else None)
-        df = clean_data(df)
-        return df
+    # cache_resource keeps the cleaned DataFrame in memory as one shared
+    # object across reruns, with no pickle round-trip on cache hits.
+    # Path loads are keyed by (path, mtime, nrows); uploads by a digest of
+    # their bytes (the underscore prefix tells Streamlit not to hash the
+    # file object itself).
+    @st.cache_resource(show_spinner='Loading metadata...')
+    def _load_metadata_cached(path, mtime, nrows):
+        # stream very large files in chunks to bound peak memory
+        if os.path.getsize(path) > 200 * 1024 * 1024:
+            return load_data_chunked(path, nrows=nrows or None)
+        return clean_data(load_data(path, nrows=nrows or None))
+
+    @st.cache_resource(show_spinner='Loading metadata...')
+    def _load_metadata_upload(digest, nrows):
+        fileobj = st.session_state[digest]
+        fileobj.seek(0)
+        df = pd.read_csv(fileobj, nrows=nrows or None)
+        return clean_data(df)
 
     if uploaded is None and not use_path:
         st.warning('Please upload `metadata.csv` or enter its path.')
         st.stop()
 
-    df = _load_metadata(use_path, uploaded, int(nrows))
+    if uploaded is not None:
+        # stash the upload under its digest so the cache key is the small
+        # digest string and the loader never receives the file object
+        digest = hashlib.blake2b(uploaded.getbuffer(), digest_size=8).hexdigest()
+        st.session_state[digest] = uploaded
+        df = _load_metadata_upload(digest, int(nrows))
+    else:
+        df = _load_metadata_cached(use_path, os.path.getmtime(use_path), int(nrows))
 
     st.sidebar.header('Filters')
-    min_year = int(df['year'].dropna().min()) if 'year' in df.columns and df['year'].dropna().size>0 else 2019
-    max_year = int(df['year'].dropna().max()) if 'year' in df.columns and df['year'].dropna().size>0 else 2022
+    # year is nullable Int16, so min/max skip NA natively — no dropna copies
+    if 'year' in df.columns and df['year'].notna().any():
+        min_year, max_year = int(df['year'].min()), int(df['year'].max())
+    else:
+        min_year, max_year = 2019, 2022
     year_range = st.sidebar.slider('Select year range', min_year, max_year, (min_year, max_year))
 
-    filtered = df.copy()
-    if 'year' in filtered.columns:
-        filtered = filtered[(filtered['year'] >= year_range[0]) & (filtered['year'] <= year_range[1])]
+    # No up-front df.copy(): build the mask and index once, so only the
+    # surviving rows are materialized (downstream code only reads filtered).
+    if 'year' in df.columns:
+        mask = df['year'].between(year_range[0], year_range[1])
+        filtered = df.loc[mask]
+    else:
+        filtered = df
 
     st.markdown(f"**Dataset loaded:** {len(df):,} rows — **Filtered:** {len(filtered):,} rows")
 
+    # Figures are cached on their (hashable) input data, so a rerun that
+    # doesn't change the filter reuses the rendered figure instead of
+    # rebuilding and re-rasterizing all of them.
+    @st.cache_data(show_spinner=False)
+    def _pubs_fig(counts_items):
+        return plot_publications_by_year(pd.Series(dict(counts_items)))
+
+    @st.cache_data(show_spinner=False)
+    def _journals_fig(counts_items):
+        return plot_top_journals(pd.Series(dict(counts_items)))
+
+    @st.cache_data(show_spinner=False)
+    def _wordcloud_fig(word_freq_items):
+        return plot_title_wordcloud(list(word_freq_items))
+
+    @st.cache_data(show_spinner=False)
+    def _sources_fig(counts_items):
+        return plot_source_distribution(pd.Series(dict(counts_items)))
+
     # Publications over time
     st.subheader('Publications by Year')
     counts = publications_by_year(filtered)
-    fig = plot_publications_by_year(counts)
-    st.pyplot(fig)
+    st.pyplot(_pubs_fig(tuple(counts.items())))
 
     # Top journals
     st.subheader('Top Journals')
     journal_counts = top_journals(filtered, top_n=20)
-    fig_j = plot_top_journals(journal_counts)
-    st.pyplot(fig_j)
+    st.pyplot(_journals_fig(tuple(journal_counts.items())))
 
     # Title word cloud
     st.subheader('Title Word Cloud')
     word_freq = title_word_frequency(filtered, top_n=200)
     try:
-        fig_w = plot_title_wordcloud(word_freq)
-        st.pyplot(fig_w)
+        st.pyplot(_wordcloud_fig(tuple(word_freq)))
     except Exception:
         st.write('Word cloud generation requires the `wordcloud` package. Install it to see this visualization.')
 
@@ -90,8 +133,7 @@ if dataset == 'CORD-19 metadata':
     st.subheader('Source Distribution')
     from data_analysis import source_counts
     src_counts = source_counts(filtered)
-    fig_s = plot_source_distribution(src_counts)
-    st.pyplot(fig_s)
+    st.pyplot(_sources_fig(tuple(src_counts.items())))
 
     # Show sample data
     st.subheader('Sample Records')
@@ -110,17 +152,27 @@ else:
 
     nrows_est = st.number_input('Read only N rows (0 = all) for estimated data', min_value=0, step=1000, value=0)
 
-    @st.cache_data
-    def _load_est(path, fileobj, nrows):
-        if fileobj is not None:
-            df = pd.read_csv(fileobj, nrows=nrows if nrows and nrows>0 else None)
-        else:
-            df = load_estimated(path, nrows=nrows if nrows and nrows>0 else None)
-        df = clean_estimated(df)
-        return df
+    # Same cache_resource pattern as the metadata branch: one in-memory
+    # DataFrame shared across reruns, keyed by (path, mtime, nrows) or by
+    # an upload digest.
+    @st.cache_resource(show_spinner='Loading estimated data...')
+    def _load_est_cached(path, mtime, nrows):
+        return clean_estimated(load_estimated(path, nrows=nrows or None))
+
+    @st.cache_resource(show_spinner='Loading estimated data...')
+    def _load_est_upload(digest, nrows):
+        fileobj = st.session_state[digest]
+        fileobj.seek(0)
+        df = pd.read_csv(fileobj, nrows=nrows or None)
+        return clean_estimated(df)
 
     try:
-        df_est = _load_est(est_path, uploaded_est, int(nrows_est))
+        if uploaded_est is not None:
+            digest_est = hashlib.blake2b(uploaded_est.getbuffer(), digest_size=8).hexdigest()
+            st.session_state[digest_est] = uploaded_est
+            df_est = _load_est_upload(digest_est, int(nrows_est))
+        else:
+            df_est = _load_est_cached(est_path, os.path.getmtime(est_path), int(nrows_est))
     except FileNotFoundError:
         st.error(f'Estimated file not found at {est_path}. Please upload or correct the path.')
         st.stop()
@@ -138,11 +190,24 @@ else:
 
     plot_choice = st.sidebar.radio('Plot type', ['Cases over time (aggregate)', 'Top countries for year'])
 
+    # Cache these figures like the CORD-19 ones, so a rerun that doesn't
+    # change the controls skips the aggregation and rasterization. The
+    # frame id is a stable cache key because the cache_resource loaders
+    # return the same object every rerun.
+    frame_key = id(df_est)
+
+    @st.cache_data(show_spinner=False)
+    def _cases_fig(key, agg):
+        return plot_cases_over_time(df_est, agg=agg)
+
+    @st.cache_data(show_spinner=False)
+    def _top_countries_fig(key, year, top_n):
+        return plot_top_countries_for_year(df_est, year, top_n=top_n)
+
     if plot_choice == 'Cases over time (aggregate)':
         st.subheader('Estimated Cases Over Time')
         try:
-            fig = plot_cases_over_time(df_est, agg='sum')
-            st.pyplot(fig)
+            st.pyplot(_cases_fig(frame_key, 'sum'))
         except Exception as e:
             st.error(f'Plot failed: {e}')
 
@@ -150,13 +215,17 @@ else:
         st.subheader(f'Top Countries by Estimated Cases — {year_selected}')
         top_n = st.sidebar.slider('Top N countries', 5, 30, 10)
         try:
-            fig = plot_top_countries_for_year(df_est, int(year_selected), top_n=top_n)
-            st.pyplot(fig)
+            st.pyplot(_top_countries_fig(frame_key, int(year_selected), top_n))
         except Exception as e:
             st.error(f'Plot failed: {e}')
 
     st.subheader('Estimated Data Summary')
-    st.write(summary_estimated(df_est))
+    # compute once per loaded frame: cache_resource hands back the same
+    # object each rerun, so id() is a stable key
+    summary_key = ('est_summary', id(df_est))
+    if summary_key not in st.session_state:
+        st.session_state[summary_key] = summary_estimated(df_est)
+    st.write(st.session_state[summary_key])
 
     st.subheader('Sample Rows')
     st.dataframe(df_est.head(50))
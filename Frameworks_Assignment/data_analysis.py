@@ -4,9 +4,12 @@ Designed to be simple and beginner-friendly.
 """
 
 from collections import Counter
+import os
 import re
+import warnings
 from typing import Tuple, List
 
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -14,22 +17,136 @@ import seaborn as sns
 sns.set(style="whitegrid")
 
 # Small stopword list for title word frequency
-STOPWORDS = set([
+STOPWORDS = frozenset({
     'the','and','of','in','to','a','for','on','with','by','an','from','study','studies','using','use','based'
-])
+})
+
+# Token pattern for title word frequency: runs of 2+ ASCII letters
+_TOKEN_RE = re.compile(r'[a-zA-Z]{2,}')
+
+# Optional numba-jitted tokenizer; worth its compile cost only for very
+# large title columns, so it kicks in above this row count.
+try:
+    from _analysis_numba import title_token_counts as _numba_title_token_counts
+except Exception:
+    _numba_title_token_counts = None
+_NUMBA_TITLE_THRESHOLD = 200_000
+
+# Only these columns are used downstream; declaring them (and their dtypes)
+# up front lets read_csv skip parsing unused columns and avoids type inference.
+CORD_USECOLS = ['title', 'abstract', 'journal', 'source_x', 'publish_time']
+CORD_DTYPES = {
+    'title': 'string',
+    'abstract': 'string',
+    'journal': 'string',
+    'source_x': 'category',
+}
 
 
 def load_data(path: str, nrows: int = None) -> pd.DataFrame:
     """Load CSV into a DataFrame. Provide nrows to sample large files.
 
+    Only the columns the analysis actually uses are read (see CORD_USECOLS),
+    with explicit dtypes to skip pandas' type-inference pass. When the whole
+    file is read, the multi-threaded PyArrow engine with Arrow-backed strings
+    is tried first (much faster parse, far lower memory for string columns);
+    older pandas or a missing pyarrow fall back to the C engine.
+
     Args:
         path: Path to metadata.csv
         nrows: optional number of rows to read
 
+    Full-file loads keep a Parquet sidecar (`<path>.parquet`) holding the
+    cleaned frame: when it is at least as new as the CSV it is read back
+    directly — a columnar read with no parsing, preserving dtypes
+    (categories, Int16, datetimes).
+
     Returns:
         pd.DataFrame
     """
-    df = pd.read_csv(path, nrows=nrows)
+    if nrows is None:
+        sidecar = path + '.parquet'
+        try:
+            if os.path.exists(sidecar) and os.path.getmtime(sidecar) >= os.path.getmtime(path):
+                return pd.read_parquet(sidecar)
+        except Exception:
+            pass
+        # pyarrow engine does not support nrows or callable usecols
+        try:
+            df = pd.read_csv(
+                path,
+                usecols=CORD_USECOLS,
+                parse_dates=['publish_time'],
+                engine='pyarrow',
+                dtype_backend='pyarrow',
+            )
+        except Exception:
+            df = None
+        if df is None:
+            df = pd.read_csv(
+                path,
+                usecols=lambda c: c in CORD_USECOLS,
+                dtype=CORD_DTYPES,
+                parse_dates=['publish_time'],
+                engine='c',
+            )
+        # best-effort: persist the cleaned frame for fast future loads,
+        # but surface failures instead of swallowing them silently
+        try:
+            clean_data(df).to_parquet(sidecar, compression='zstd')
+        except Exception as exc:
+            warnings.warn(f'could not write Parquet sidecar {sidecar}: {exc}')
+        return df
+    df = pd.read_csv(
+        path,
+        nrows=nrows,
+        usecols=lambda c: c in CORD_USECOLS,
+        dtype=CORD_DTYPES,
+        parse_dates=['publish_time'],
+        engine='c',
+    )
+    return df
+
+
+def load_data_chunked(path: str, nrows: int = None, chunksize: int = 500_000) -> pd.DataFrame:
+    """Load and clean metadata.csv in chunks to bound peak memory.
+
+    A single read_csv of a multi-GB file holds the parse buffers and the
+    full frame in memory at once; streaming `chunksize` rows at a time and
+    cleaning each chunk before concatenation keeps the peak bounded.
+
+    Args:
+        path: Path to metadata.csv
+        nrows: optional cap on rows to read
+        chunksize: rows per chunk
+
+    Returns:
+        cleaned pd.DataFrame (already passed through clean_data)
+    """
+    pieces = []
+    rows = 0
+    reader = pd.read_csv(
+        path,
+        chunksize=chunksize,
+        usecols=lambda c: c in CORD_USECOLS,
+        dtype=CORD_DTYPES,
+        parse_dates=['publish_time'],
+        engine='c',
+    )
+    for chunk in reader:
+        pieces.append(clean_data(chunk))
+        rows += len(chunk)
+        if nrows and rows >= nrows:
+            break
+    if not pieces:
+        return pd.DataFrame(columns=CORD_USECOLS)
+    df = pd.concat(pieces, copy=False, ignore_index=True)
+    # concat demotes categoricals whose per-chunk categories differ
+    for c in ('journal', 'source_x'):
+        if c in df.columns and not isinstance(df[c].dtype, pd.CategoricalDtype):
+            df[c] = df[c].astype('category')
+    if nrows:
+        df = df.head(nrows)
     return df
 
 
@@ -52,14 +169,21 @@ def clean_data(df: pd.DataFrame) -> pd.DataFrame:
         date_col = None
 
     if date_col:
-        df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
-        df['year'] = df[date_col].dt.year
+        # load_data already parses publish_time; only convert if the frame
+        # came from elsewhere (e.g. an uploaded file read without parse_dates)
+        if not pd.api.types.is_datetime64_any_dtype(df[date_col]):
+            df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
+        # nullable Int16 keeps missing years without the NaN->float64
+        # upcast and scans 4x less memory in the year filters
+        df['year'] = df[date_col].dt.year.astype('Int16')
     else:
-        df['year'] = pd.NaT
+        df['year'] = pd.Series(pd.NA, index=df.index, dtype='Int16')
 
     # Abstract word count
     if 'abstract' in df.columns:
-        df['abstract_word_count'] = df['abstract'].fillna('').astype(str).apply(lambda s: len(s.split()))
+        # str.count runs the regex in C over the whole column; int32 is
+        # plenty for a word count and halves the column's footprint
+        df['abstract_word_count'] = df['abstract'].fillna('').str.count(r'\S+').astype('int32')
     else:
         df['abstract_word_count'] = 0
 
@@ -67,6 +191,18 @@ def clean_data(df: pd.DataFrame) -> pd.DataFrame:
     if 'title' in df.columns:
         df['title'] = df['title'].fillna('').astype(str)
 
+    # Highly repetitive string columns: category dtype shrinks them to a
+    # small code book and makes value_counts/equality filters integer ops.
+    # Missing values are filled here ('Unknown') because fillna on an
+    # existing categorical cannot introduce a new category.
+    for c in ('journal', 'source_x'):
+        if c in df.columns:
+            if isinstance(df[c].dtype, pd.CategoricalDtype):
+                if df[c].isna().any():
+                    df[c] = df[c].cat.add_categories('Unknown').fillna('Unknown')
+            else:
+                df[c] = df[c].fillna('Unknown').astype('category')
+
     # Drop rows with no title and no abstract
     df = df[(df['title'].str.strip() != '') | (df['abstract_word_count'] > 0)]
 
@@ -79,8 +215,16 @@ def publications_by_year(df: pd.DataFrame) -> pd.Series:
     """Return series indexed by year with counts."""
     if 'year' not in df.columns:
         return pd.Series(dtype=int)
-    counts = df['year'].dropna().astype(int).value_counts().sort_index()
-    return counts
+    # years span a tiny range, so a bincount histogram (one sequential
+    # C pass, no hash table, no sort) beats value_counts
+    y = df['year'].dropna().to_numpy(dtype=np.int64)
+    if y.size == 0:
+        return pd.Series(dtype=int)
+    lo, hi = int(y.min()), int(y.max())
+    counts = np.bincount(y - lo, minlength=hi - lo + 1)
+    series = pd.Series(counts, index=np.arange(lo, hi + 1))
+    # keep parity with value_counts(): only years that actually occur
+    return series[series > 0]
 
 
 def top_journals(df: pd.DataFrame, top_n: int = 10) -> pd.Series:
@@ -92,8 +236,15 @@ def top_journals(df: pd.DataFrame, top_n: int = 10) -> pd.Series:
             break
     if col is None:
         return pd.Series(dtype=int)
-    counts = df[col].fillna('Unknown').value_counts().head(top_n)
-    return counts
+    s = df[col]
+    # cleaned frames carry categoricals with missing already filled
+    if not isinstance(s.dtype, pd.CategoricalDtype):
+        s = s.fillna('Unknown')
+    counts = s.value_counts()
+    # categorical value_counts includes zero-count categories (e.g. after
+    # a year filter); keep only observed values like object dtype did
+    counts = counts[counts > 0]
+    return counts.head(top_n)
 
 
 def source_counts(df: pd.DataFrame) -> pd.Series:
@@ -105,7 +256,12 @@ def source_counts(df: pd.DataFrame) -> pd.Series:
             break
     if col is None:
         return pd.Series(dtype=int)
-    return df[col].fillna('Unknown').value_counts()
+    s = df[col]
+    if not isinstance(s.dtype, pd.CategoricalDtype):
+        s = s.fillna('Unknown')
+    counts = s.value_counts()
+    # drop zero-count categories so filtered frames match object-dtype output
+    return counts[counts > 0]
 
 
 def title_word_frequency(df: pd.DataFrame, top_n: int = 50) -> List[Tuple[str, int]]:
@@ -113,15 +269,19 @@ def title_word_frequency(df: pd.DataFrame, top_n: int = 50) -> List[Tuple[str, i
 
     Returns list of (word, count) sorted by count desc.
     """
-    texts = df['title'].dropna().astype(str).str.lower().tolist() if 'title' in df.columns else []
-    words = []
-    for t in texts:
-        # split on non-alpha
-        for w in re.findall(r"[a-zA-Z]{2,}", t):
-            if w in STOPWORDS:
-                continue
-            words.append(w)
-    c = Counter(words)
+    if 'title' not in df.columns:
+        return []
+    titles = df['title'].dropna()
+    if _numba_title_token_counts is not None and len(titles) >= _NUMBA_TITLE_THRESHOLD:
+        token_counts = _numba_title_token_counts(titles.astype(str).tolist())
+        c = Counter({w: n for w, n in token_counts.items() if w not in STOPWORDS})
+        return c.most_common(top_n)
+    # one findall over all titles joined into a single string: a lone
+    # C-level regex pass, with none of the per-title call overhead and no
+    # exploded intermediate Series
+    joined = '\n'.join(titles.astype(str)).lower()
+    words = _TOKEN_RE.findall(joined)
+    c = Counter(w for w in words if w not in STOPWORDS)
     return c.most_common(top_n)
 
 
@@ -134,6 +294,9 @@ def plot_publications_by_year(counts: pd.Series) -> plt.Figure:
     ax.set_ylabel('Number of publications')
     ax.set_title('Publications by Year')
     plt.tight_layout()
+    # close so the Agg backend does not retain every figure across reruns;
+    # the returned object can still be rendered by the caller
+    plt.close(fig)
     return fig
 
 
@@ -143,6 +306,9 @@ def plot_top_journals(counts: pd.Series) -> plt.Figure:
     ax.set_xlabel('Number of publications')
     ax.set_title('Top Publishing Journals')
     plt.tight_layout()
+    # close so the Agg backend does not retain every figure across reruns;
+    # the returned object can still be rendered by the caller
+    plt.close(fig)
     return fig
 
 
@@ -160,6 +326,9 @@ def plot_title_wordcloud(word_freq: List[Tuple[str, int]]) -> plt.Figure:
     ax.axis('off')
     ax.set_title('Word Cloud — Titles')
     plt.tight_layout()
+    # close so the Agg backend does not retain every figure across reruns;
+    # the returned object can still be rendered by the caller
+    plt.close(fig)
     return fig
 
 
@@ -169,6 +338,9 @@ def plot_source_distribution(counts: pd.Series) -> plt.Figure:
     ax.set_ylabel('')
     ax.set_title('Top Sources (by count)')
     plt.tight_layout()
+    # close so the Agg backend does not retain every figure across reruns;
+    # the returned object can still be rendered by the caller
+    plt.close(fig)
     return fig
 
 
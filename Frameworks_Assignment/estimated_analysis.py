@@ -4,21 +4,86 @@ This file provides simple loading, cleaning, summary, and plotting functions
 that use the median columns (e.g., `No. of cases_median`) for numeric analysis.
 """
 
+import os
+import warnings
+
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from typing import Tuple
 
+# Only the columns the analysis uses, with explicit dtypes so read_csv can
+# skip unused columns and avoid a type-inference pass.
+EST_USECOLS = ['Country', 'Year', 'No. of cases_median', 'No. of deaths_median', 'WHO Region']
+EST_DTYPES = {
+    'Country': 'category',
+    'WHO Region': 'category',
+    'No. of cases_median': 'float64',
+    'No. of deaths_median': 'float64',
+}
+
+# Optional parallel year-sum kernel; only worth its compile cost on
+# frames large enough for multi-core bandwidth to matter.
+try:
+    from _analysis_numba import year_sum as _numba_year_sum
+except Exception:
+    _numba_year_sum = None
+_NUMBA_SUM_THRESHOLD = 1_000_000
+
 
 def load_estimated(path: str, nrows: int = None) -> pd.DataFrame:
     """Load the estimated numbers CSV.
 
+    Only the columns used downstream are read (see EST_USECOLS), with
+    explicit dtypes for the numeric median columns.
+
     Args:
         path: path to `estimated_numbers.csv`
         nrows: optional number of rows to read
+    Full-file loads keep a Parquet sidecar (`<path>.parquet`) with the
+    cleaned frame and prefer it while it is fresher than the CSV.
+
     Returns:
         DataFrame
     """
-    df = pd.read_csv(path, nrows=nrows)
+    if nrows is None:
+        sidecar = path + '.parquet'
+        try:
+            if os.path.exists(sidecar) and os.path.getmtime(sidecar) >= os.path.getmtime(path):
+                return pd.read_parquet(sidecar)
+        except Exception:
+            pass
+        # pyarrow engine does not support nrows or callable usecols
+        try:
+            df = pd.read_csv(
+                path,
+                usecols=EST_USECOLS,
+                engine='pyarrow',
+                dtype_backend='pyarrow',
+            )
+        except Exception:
+            df = None
+        if df is None:
+            df = pd.read_csv(
+                path,
+                usecols=lambda c: c in EST_USECOLS,
+                dtype=EST_DTYPES,
+                engine='c',
+            )
+        # best effort, but surface failures — a silent pass here once hid
+        # a fully reproducible serialization error
+        try:
+            clean_estimated(df).to_parquet(sidecar, compression='zstd')
+        except Exception as exc:
+            warnings.warn(f'could not write Parquet sidecar {sidecar}: {exc}')
+        return df
+    df = pd.read_csv(
+        path,
+        nrows=nrows,
+        usecols=lambda c: c in EST_USECOLS,
+        dtype=EST_DTYPES,
+        engine='c',
+    )
     return df
 
 
@@ -34,9 +99,15 @@ def clean_estimated(df: pd.DataFrame) -> pd.DataFrame:
     # strip column names
     df.columns = [c.strip() for c in df.columns]
 
-    # strip string values
-    for col in df.select_dtypes(include=['object']).columns:
-        df[col] = df[col].astype(str).str.strip()
+    # strip string values, but only for the columns we actually keep —
+    # stripping columns that are dropped below is wasted work
+    for col in ('Country', 'WHO Region'):
+        if col not in df.columns:
+            continue
+        if pd.api.types.is_object_dtype(df[col]):
+            df[col] = df[col].astype('string').str.strip()
+        elif pd.api.types.is_string_dtype(df[col]):
+            df[col] = df[col].str.strip()
 
     # Normalize common names
     if 'No. of cases_median' in df.columns:
@@ -49,20 +120,22 @@ def clean_estimated(df: pd.DataFrame) -> pd.DataFrame:
     else:
         deaths_col = None
 
-    # Year
+    # Year (Int16 is ample for calendar years and keeps NA support)
     if 'Year' in df.columns:
         df['Year'] = df['Year'].astype(str).str.strip()
-        df['Year'] = pd.to_numeric(df['Year'], errors='coerce').astype('Int64')
+        df['Year'] = pd.to_numeric(df['Year'], errors='coerce').astype('Int16')
 
-    # Numeric medians
+    # Numeric medians, downcast to float32 when the value range allows.
+    # An already-cleaned frame (e.g. from a Parquet sidecar) keeps its
+    # existing cases_median/deaths_median untouched.
     if cases_col:
-        df['cases_median'] = pd.to_numeric(df[cases_col], errors='coerce')
-    else:
+        df['cases_median'] = pd.to_numeric(df[cases_col], errors='coerce', downcast='float')
+    elif 'cases_median' not in df.columns:
         df['cases_median'] = pd.NA
 
     if deaths_col:
-        df['deaths_median'] = pd.to_numeric(df[deaths_col], errors='coerce')
-    else:
+        df['deaths_median'] = pd.to_numeric(df[deaths_col], errors='coerce', downcast='float')
+    elif 'deaths_median' not in df.columns:
         df['deaths_median'] = pd.NA
 
     # Keep useful columns
@@ -75,6 +148,23 @@ def clean_estimated(df: pd.DataFrame) -> pd.DataFrame:
     if 'Year' in result.columns:
         result = result[result['Year'].notna()]
 
+    # Country/region values repeat heavily; category dtype makes the
+    # per-year filters and value_counts integer-code operations
+    for c in ('Country', 'WHO Region'):
+        if c in result.columns:
+            result[c] = result[c].astype('category')
+
+    # Precompute year -> row positions so per-year lookups don't rescan
+    # the frame; built once here since the cleaned frame is cached.
+    # Positions are stored as plain lists: ndarray values in attrs break
+    # pandas' attrs-equality check during concat-based ops (and are not
+    # JSON-serializable when writing Parquet).
+    if 'Year' in result.columns:
+        years = result['Year'].to_numpy(dtype='int64', na_value=-1)
+        result.attrs['year_index'] = {
+            int(y): np.flatnonzero(years == y).tolist() for y in np.unique(years) if y >= 0
+        }
+
     return result
 
 
@@ -83,8 +173,14 @@ def summary_estimated(df: pd.DataFrame) -> dict:
     s = {}
     s['rows'] = len(df)
     s['columns'] = df.columns.tolist()
-    s['dtypes'] = df.dtypes.apply(lambda x: str(x)).to_dict()
-    s['missing'] = df.isnull().sum().to_dict()
+    s['dtypes'] = {c: str(t) for c, t in df.dtypes.items()}
+    # count missing only in the columns the summary panel reports,
+    # not across the whole frame
+    s['missing'] = {
+        c: int(df[c].isna().sum())
+        for c in ('Country', 'Year', 'cases_median', 'deaths_median', 'WHO Region')
+        if c in df.columns
+    }
     # Most recent and earliest year
     if 'Year' in df.columns:
         years = df['Year'].dropna().astype(int)
@@ -106,11 +202,25 @@ def plot_cases_over_time(df: pd.DataFrame, agg='sum') -> plt.Figure:
     if 'Year' not in df.columns or 'cases_median' not in df.columns:
         raise ValueError('DataFrame must contain Year and cases_median columns')
 
-    grouped = df.groupby('Year')['cases_median']
     if agg == 'sum':
-        series = grouped.sum()
+        # years span a few dozen bins, so a weighted bincount (one
+        # sequential pass) beats the hash-based groupby machinery
+        y = df['Year'].to_numpy(dtype='int64', na_value=-1)
+        v = df['cases_median'].to_numpy(dtype='float64', na_value=np.nan)
+        m = (y >= 0) & ~np.isnan(v)
+        y, v = y[m], v[m]
+        if y.size == 0:
+            raise ValueError('no non-missing Year/cases_median values to plot')
+        lo, hi = int(y.min()), int(y.max())
+        if _numba_year_sum is not None and y.size >= _NUMBA_SUM_THRESHOLD:
+            sums = _numba_year_sum(y, v, lo, hi - lo + 1)
+        else:
+            sums = np.bincount(y - lo, weights=v, minlength=hi - lo + 1)
+        present = np.bincount(y - lo, minlength=hi - lo + 1) > 0
+        series = pd.Series(sums, index=np.arange(lo, hi + 1))[present]
     else:
-        series = grouped.median()
+        # median has no streaming accumulator; keep groupby
+        series = df.groupby('Year', observed=True)['cases_median'].median()
 
     fig, ax = plt.subplots(figsize=(8, 4))
     series.plot(ax=ax, marker='o')
@@ -118,6 +228,9 @@ def plot_cases_over_time(df: pd.DataFrame, agg='sum') -> plt.Figure:
     ax.set_xlabel('Year')
     ax.set_ylabel('Cases (median)')
     plt.tight_layout()
+    # close so the Agg backend does not retain every figure across reruns;
+    # the returned object can still be rendered by the caller
+    plt.close(fig)
     return fig
 
 
@@ -125,14 +238,23 @@ def plot_top_countries_for_year(df: pd.DataFrame, year: int, top_n: int = 10) ->
     """Plot top countries by `cases_median` for a given year."""
     if 'Year' not in df.columns:
         raise ValueError('Year column not found')
-    sub = df[df['Year'] == year]
+    year_index = df.attrs.get('year_index')
+    if year_index is not None:
+        # O(1) lookup from the index built in clean_estimated
+        sub = df.take(year_index.get(int(year), []))
+    else:
+        sub = df[df['Year'] == year]
     sub = sub.dropna(subset=['cases_median'])
-    top = sub.sort_values('cases_median', ascending=False).head(top_n)
+    # nlargest is a partial select (O(N log k)) vs a full sort
+    top = sub.nlargest(top_n, 'cases_median')
     fig, ax = plt.subplots(figsize=(8, 5))
-    ax.barh(top['Country'][::-1], top['cases_median'][::-1], color='#2b8cbe')
+    ax.barh(top['Country'].iloc[::-1], top['cases_median'].iloc[::-1], color='#2b8cbe')
     ax.set_title(f'Top {top_n} Countries by Estimated Cases (median) — {year}')
     ax.set_xlabel('Cases (median)')
     plt.tight_layout()
+    # close so the Agg backend does not retain every figure across reruns;
+    # the returned object can still be rendered by the caller
+    plt.close(fig)
     return fig
 
 